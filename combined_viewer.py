@@ -3,34 +3,48 @@
 # Summary: PyQt6 email viewer that pulls the newest matching Outlook email,
 #          renders HTML (QWebEngine), extracts DOM {visible_text, links},
 #          scores/selects a primary portal link, shows JSON in UI, and chats with an LLM via Ollama.
-# Caller: Run directly: `python combined_viewer.py`
+# Caller: Run directly: `python combined_viewer.py` (add `--headless` to just write email_output.json)
 # References: PyQt6, win32com.client (Outlook), Ollama local API
 
-import sys, json, traceback
-from concurrent.futures import ThreadPoolExecutor
-from typing import Dict, Any, List, Optional
+import sys, re, heapq, asyncio, hashlib, functools, traceback
+from pathlib import Path
+from urllib.parse import urlsplit
+from typing import Dict, Any, List, Optional, Callable
 
+import orjson
+import qasync
 import win32com.client
+from selectolax.lexbor import LexborHTMLParser
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QTextBrowser, QListWidget, QListWidgetItem, QGroupBox,
+    QLabel, QTextBrowser, QListView, QGroupBox,
     QSplitter, QCheckBox, QLineEdit, QPushButton, QMessageBox
 )
 from PyQt6.QtWebEngineWidgets import QWebEngineView
-from PyQt6.QtCore import QTimer, Qt, QMetaObject, Q_ARG
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+from PyQt6.QtGui import QTextCursor
+
+try:
+    import ahocorasick  # optional: pyahocorasick, multi-pattern link scoring
+except ImportError:
+    ahocorasick = None
 
 # --------- Config ---------
 
+@functools.lru_cache(maxsize=1)
 def load_config(path: str = "config.json") -> Dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as f:
-        cfg = json.load(f)
+    # Cached: re-imports and repeat callers share one parsed dict (treat it as read-only)
+    cfg = orjson.loads(Path(path).read_bytes())
     # sensible defaults
     cfg.setdefault("account", "Commercial Estimator")
     cfg.setdefault("sender_domain", "planhub.com")
     cfg.setdefault("senders", [])  # explicit allow-list overrides domain
     cfg.setdefault("ollama_host", "http://localhost:11434")
-    cfg.setdefault("model", "gemma2:9b-instruct-q4")
-    cfg.setdefault("dom_delay_ms", 800)
+    cfg.setdefault("model", "gemma2:9b-instruct-q4_K_M")
+    cfg.setdefault("model_fallback", "gemma2:2b-instruct-q4_K_M")  # used if the server can't run "model"
+    cfg.setdefault("keep_alive", "30m")  # how long Ollama keeps the model resident
+    cfg.setdefault("llm_options", {"num_ctx": 4096, "num_batch": 256})  # Ollama runtime options
+    cfg.setdefault("max_context_chars", 4000)  # body text budget per prompt (chars, before separators)
     return cfg
 
 CONFIG = load_config()
@@ -43,13 +57,26 @@ def find_store(namespace, display_name: str):
             return f
     return None
 
-def sender_matches(smtp: str, cfg: Dict[str, Any]) -> bool:
-    smtp_l = (smtp or "").lower()
-    allow = [s.lower() for s in cfg.get("senders", [])]
+# Sender address as seen by DASL: the From address, plus the SMTP address Exchange
+# stamps on internal (X500) senders so they match the same rules.
+SENDER_PROPS = (
+    "urn:schemas:httpmail:fromemail",
+    "http://schemas.microsoft.com/mapi/proptag/0x5D01001F",  # PR_SENDER_SMTP_ADDRESS
+)
+
+def _dasl_literal(s: str) -> str:
+    return "'" + s.replace("'", "''") + "'"
+
+def sender_filter(cfg: Dict[str, Any]) -> str:
+    """Build an Items.Restrict query for the sender rules: allow-list OR domain. Empty if no rules."""
+    allow = [s.lower() for s in cfg.get("senders", []) if s]
     domain = (cfg.get("sender_domain") or "").lower()
-    if allow and smtp_l in allow:
-        return True
-    return bool(domain and domain in smtp_l)
+    clauses = []
+    for prop in SENDER_PROPS:
+        clauses += [f'"{prop}" = {_dasl_literal(s)}' for s in allow]
+        if domain:
+            clauses.append(f'"{prop}" LIKE {_dasl_literal("%" + domain + "%")}')
+    return "@SQL=" + " OR ".join(f"({c})" for c in clauses) if clauses else ""
 
 def get_newest_matching_email_html(cfg: Dict[str, Any]) -> tuple[Dict[str, Any], str]:
     """Return (pointer, html_or_text) for the newest email in cfg['account'] Inbox matching sender rules."""
@@ -61,38 +88,85 @@ def get_newest_matching_email_html(cfg: Dict[str, Any]) -> tuple[Dict[str, Any],
         raise RuntimeError(f"Outlook store not found: {cfg['account']}")
 
     inbox = store.Folders["Inbox"]
-    items = inbox.Items
-    items.Sort("[ReceivedTime]", True)
 
-    for itm in items:
-        smtp = ""
+    # The store's index does the sender matching; rows carry only what we need to pick one
+    itm = full = None
+    query = sender_filter(cfg)
+    if query:
+        items = inbox.Items.Restrict(query)
+        items.Sort("[ReceivedTime]", True)
+        items.SetColumns("EntryID, SenderEmailAddress, SenderEmailType")
+        itm = items.GetFirst()
+        while itm is not None:
+            # Open the full item (HTMLBody etc.) for the newest row only; step past
+            # rows that can no longer be opened (moved/deleted since the Restrict)
+            try:
+                full = ns.GetItemFromID(itm.EntryID)
+                break
+            except Exception:
+                itm = items.GetNext()
+
+    if itm is None:
+        raise RuntimeError(
+            f"No matching email found in '{cfg['account']}' inbox "
+            f"(senders={cfg.get('senders') or '[]'}, domain='{cfg.get('sender_domain')}')"
+        )
+
+    entry_id = itm.EntryID
+    smtp = itm.SenderEmailAddress or ""
+    if itm.SenderEmailType == "EX":
+        # X500 address; resolve the real SMTP off the full item
         try:
-            # Most robust path in Exchange environments
-            exu = itm.Sender.GetExchangeUser()
-            smtp = (exu.PrimarySmtpAddress if exu else "") or ""
+            exu = full.Sender.GetExchangeUser()
+            smtp = (exu.PrimarySmtpAddress if exu else "") or smtp
         except Exception:
             pass
-        if not smtp:
-            try:
-                smtp = itm.SenderEmailAddress or ""
-            except Exception:
-                smtp = ""
-
-        if sender_matches(smtp, cfg):
-            ptr = {
-                "account": cfg["account"],
-                "mailbox": "Inbox",
-                "message_id": getattr(itm, "EntryID", None),  # Outlook pointer
-                "subject": getattr(itm, "Subject", ""),
-                "from": smtp.lower(),
-            }
-            html = getattr(itm, "HTMLBody", "") or getattr(itm, "Body", "")
-            return ptr, html
-
-    raise RuntimeError(
-        f"No matching email found in '{cfg['account']}' inbox "
-        f"(senders={cfg.get('senders') or '[]'}, domain='{cfg.get('sender_domain')}')"
-    )
+
+    ptr = {
+        "account": cfg["account"],
+        "mailbox": "Inbox",
+        "message_id": entry_id,  # Outlook pointer
+        "subject": full.Subject or "",
+        "from": smtp.lower(),
+    }
+    html = getattr(full, "HTMLBody", "") or getattr(full, "Body", "")
+    return ptr, html
+
+# --------- DOM extraction ---------
+
+# Inline-hidden nodes (preheaders, tracking blocks) the renderer would not show
+HIDDEN_SELECTOR = '[style*="display:none"], [style*="display: none"], [style*="visibility:hidden"], [hidden]'
+# Where innerText would break the line; table cells get a tab like innerText does
+BLOCK_SELECTOR = "p, div, br, tr, li, h1, h2, h3, h4, h5, h6, table, blockquote, hr"
+LINE_MARK, CELL_MARK = "\ue000", "\ue001"  # private-use, never in real mail
+
+def extract_dom(html: str) -> Dict[str, Any]:
+    """Parse email HTML into {text, links} without a browser: visible-ish body text and non-mailto/tel anchors."""
+    tree = LexborHTMLParser(html or "")
+    tree.strip_tags(["script", "style", "noscript", "template"])
+    for node in tree.css(HIDDEN_SELECTOR):
+        node.decompose()
+
+    # Raw attribute values, unlike the browser's a.href: schemes keep their case (hence
+    # the lower()) and relative hrefs are not resolved against a base URL
+    links = []
+    for a in tree.css("a[href]"):
+        href = (a.attributes.get("href") or "").strip()
+        if not href or href.lower().startswith(("mailto:", "tel:")):
+            continue
+        links.append({"text": " ".join(a.text(separator=" ").split()), "href": href})
+
+    # Mark breaks, collapse source whitespace like a renderer, then turn the marks into \n / \t
+    for node in tree.css(BLOCK_SELECTOR):
+        node.insert_before(LINE_MARK)
+        node.insert_after(LINE_MARK)
+    for node in tree.css("td, th"):
+        node.insert_after(CELL_MARK)
+    body = tree.body
+    raw = re.sub(r"\s+", " ", body.text(separator="") if body is not None else "")
+    raw = raw.replace(CELL_MARK, "\t").replace(LINE_MARK, "\n")
+    text = "\n".join(line.strip() for line in raw.splitlines() if line.strip())
+    return {"text": text, "links": links}
 
 # --------- Link scoring ---------
 
@@ -103,48 +177,197 @@ WHITELIST_DOMAINS = [
 INTENT_WORDS = ["view project", "submit", "bid", "open invite", "project", "plans", "portal", "itb"]
 HREF_HINTS = ["project", "bid", "invite", "itb", "plan", "rfi"]
 NEGATIVE_HINTS = ["unsubscribe", "preferences", "kb.", "knowledge", "support", "terms", "privacy"]
+WHITELIST = frozenset(WHITELIST_DOMAINS)
+
+def host_whitelisted(href_l: str) -> bool:
+    """True if the URL's host is a whitelisted domain or a subdomain of one (label-aligned suffix lookup)."""
+    try:
+        host = urlsplit(href_l).hostname or ""
+    except ValueError:
+        return False
+    labels = host.split(".")
+    return any(".".join(labels[i:]) in WHITELIST for i in range(len(labels) - 1))
+
+def _build_matcher(*groups: tuple[List[str], float]) -> Callable[[str], float]:
+    """Compile (patterns, delta) groups into fn(s) -> summed delta of the distinct patterns found in s."""
+    deltas: Dict[str, float] = {}
+    for patterns, delta in groups:
+        for p in patterns:
+            deltas[p] = deltas.get(p, 0.0) + delta
+
+    if ahocorasick is None:
+        table = tuple(deltas.items())
+        return lambda s: sum(d for p, d in table if p in s)
+
+    # One pass over s; iter() also reports overlapping hits ("plan" inside "planhub.com")
+    ac = ahocorasick.Automaton()
+    for p, d in deltas.items():
+        ac.add_word(p, (p, d))
+    ac.make_automaton()
+
+    def match(s: str) -> float:
+        hits = {p: d for _, (p, d) in ac.iter(s)}  # each pattern counts once
+        return sum(hits.values())
+    return match
+
+_score_href = _build_matcher((HREF_HINTS, 0.1), (NEGATIVE_HINTS, -1.0))
+_score_text = _build_matcher((INTENT_WORDS, 0.3))
 
 def score_link(href: str, text: str) -> float:
     href_l, text_l = (href or "").lower(), (text or "").lower()
-    score = 0.0
     if not href_l:
         return -999.0
-    for d in WHITELIST_DOMAINS:
-        if d in href_l:
-            score += 0.6
-    for w in INTENT_WORDS:
-        if w in text_l:
-            score += 0.3
+    score = _score_href(href_l) + _score_text(text_l)
+    if host_whitelisted(href_l):
+        score += 0.6
     if href_l.count("/") >= 4:
         score += 0.1
-    for q in HREF_HINTS:
-        if q in href_l:
-            score += 0.1
-    for bad in NEGATIVE_HINTS:
-        if bad in href_l:
-            score -= 1.0
     return score
 
-def rank_links(links: List[Dict[str, str]]) -> List[Dict[str, Any]]:
-    ranked = []
-    for l in links:
-        href = l.get("href", "")
-        text = l.get("text", "")
-        ranked.append({"text": text, "href": href, "score": score_link(href, text)})
-    ranked.sort(key=lambda r: r["score"], reverse=True)
-    return ranked
+TOP_LINKS = 10  # covers primary + aux (1 + 5) and the prompt's link list (10)
+
+def rank_links(links: List[Dict[str, str]], top: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Score links best-first; with `top`, only the best `top` via a bounded heap (same order as a full sort)."""
+    ranked = (
+        {"text": l.get("text", ""), "href": l.get("href", ""),
+         "score": score_link(l.get("href", ""), l.get("text", ""))}
+        for l in links
+    )
+    if top is None:
+        return sorted(ranked, key=lambda r: r["score"], reverse=True)
+    return heapq.nlargest(top, ranked, key=lambda r: r["score"])
+
+# --------- Email JSON ---------
+
+OUTPUT_PATH = Path("email_output.json")  # working file for downstream tools
+
+def build_email_data(ptr: Dict[str, Any], dom: Dict[str, Any]) -> tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Rank the DOM links and assemble the email JSON; returns (email_data, top ranked links)."""
+    visible_text = (dom or {}).get("text", "") or ""
+    links = (dom or {}).get("links", []) or []
+
+    # Rank & choose primary portal
+    ranked = rank_links(links, top=TOP_LINKS)
+    primary = ranked[0]["href"] if ranked and ranked[0]["score"] > 0.3 else None
+
+    email_data = {
+        "email_ptr": ptr,
+        "dom": {
+            "visible_text": visible_text,
+            "links": links  # full hrefs preserved
+        },
+        "links": {
+            "primary_portal": primary,
+            "aux": [{"text": r["text"], "href": r["href"]} for r in ranked[1:6]]
+        }
+    }
+    return email_data, ranked
 
 # --------- Ollama (LLM) ---------
 
-def call_ollama(cfg: Dict[str, Any], message: str) -> str:
+KEY_TERMS = re.compile(r"\b(?:project|due|bid)", re.IGNORECASE)
+
+def clip_text(text: str, limit: int) -> str:
+    """Trim text to `limit` chars for a prompt: the head plus the later window densest in KEY_TERMS."""
+    if len(text) <= limit:
+        return text
+    win = limit // 4  # taken out of the budget, so head + window stays within `limit`
+    head = text[:limit - win]
+    hits = [m.start() for m in KEY_TERMS.finditer(text, limit - win)]
+    if not hits:
+        return text[:limit] + "\n…"
+    best_n, best_start, j = 0, hits[0], 0
+    for i, h in enumerate(hits):
+        while hits[j] < h - win:
+            j += 1
+        if i - j + 1 > best_n:
+            best_n, best_start = i - j + 1, hits[j]
+    return f"{head}\n…\n{text[best_start:best_start + win]}"
+
+# Fixed system turn: identical across sends, so Ollama can reuse its KV cache for this prefix
+SYSTEM_PROMPT = (
+    "You are a bid-invite extractor. Answer the user precisely.\n"
+    "If asked, extract fields as JSON using keys: project_name, address, zip, due_date, gc_name, contacts[], links.primary.\n"
+)
+
+def make_ollama_client(cfg: Dict[str, Any]):
     # Lazy import to avoid import cost if unused
     import ollama
-    client = ollama.Client(host=cfg["ollama_host"])
-    resp = client.chat(model=cfg["model"], messages=[{"role": "user", "content": message}])
-    return resp["message"]["content"].strip()
+    return ollama.AsyncClient(host=cfg["ollama_host"])
+
+async def preload_model(cfg: Dict[str, Any], client=None) -> None:
+    """Load the model into Ollama ahead of the first message (an empty prompt only loads weights)."""
+    client = client or make_ollama_client(cfg)
+    # Same options as chat: a different num_ctx would make Ollama reload the model
+    await client.generate(model=cfg["model"], prompt="", options=cfg["llm_options"], keep_alive=cfg["keep_alive"])
+
+async def call_ollama(cfg: Dict[str, Any], message: str, client=None,
+                      on_chunk: Optional[Callable[[str], None]] = None,
+                      system: Optional[str] = None, model: Optional[str] = None) -> tuple[str, str]:
+    """Stream a chat completion, handing each piece to on_chunk as it arrives.
+
+    Returns (reply, model that produced it). `model` defaults to cfg['model']; if the server
+    rejects it (missing, out of memory) before any output, retries once with cfg['model_fallback'].
+    """
+    import ollama
+    client = client or make_ollama_client(cfg)
+    models = [model or cfg["model"]]
+    if cfg.get("model_fallback") and cfg["model_fallback"] != models[0]:
+        models.append(cfg["model_fallback"])
+
+    messages = [{"role": "user", "content": message}]
+    if system:
+        messages.insert(0, {"role": "system", "content": system})
+
+    for i, model in enumerate(models):
+        parts = []
+        try:
+            stream = await client.chat(model=model, messages=messages, stream=True,
+                                       options=cfg["llm_options"], keep_alive=cfg["keep_alive"])
+            async for chunk in stream:
+                piece = chunk["message"]["content"]
+                parts.append(piece)
+                if on_chunk and piece:
+                    on_chunk(piece)
+        except ollama.ResponseError:
+            if parts or i == len(models) - 1:
+                raise
+            continue
+        return "".join(parts).strip(), model
 
 # --------- Main Window ---------
 
+class LinksModel(QAbstractListModel):
+    """Read-only link rows ("text -> href", href clipped) with the full href as tooltip."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: List[tuple[str, str]] = []
+
+    def set_links(self, links: List[Dict[str, str]]):
+        rows = []
+        for l in links:
+            text = l.get("text", "") or ""
+            href = l.get("href", "") or ""
+            ui_href = href if len(href) <= 100 else href[:100] + "…"
+            rows.append((f"{text} -> {ui_href}", href))
+        # One reset -> one layout pass, however many links
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._rows[index.row()][0]
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return self._rows[index.row()][1]  # full URL on hover
+        return None
+
 class CombinedViewer(QMainWindow):
     def __init__(self, html: str, ptr: Dict[str, Any], cfg: Dict[str, Any]):
         super().__init__()
@@ -152,13 +375,30 @@ class CombinedViewer(QMainWindow):
         self.ptr = ptr
         self.html = html
         self.email_data: Optional[Dict[str, Any]] = None
-        self.pool = ThreadPoolExecutor(max_workers=2)
+        self.ranked_links: List[Dict[str, Any]] = []
+        self._llm_cache: Dict[str, str] = {}  # (model, prompt) digest -> reply
+        self._model = cfg["model"]  # switches to the fallback once the primary has failed
+        self._ptr_json = self._links_json = self._body_text = ""  # prompt sections, set in _on_dom
+        self._tasks: set[asyncio.Task] = set()
+        self.ollama_client = make_ollama_client(cfg)  # one keep-alive HTTP session for all sends
+        self._spawn(preload_model(cfg, self.ollama_client))  # warm while the email renders
 
         self.setWindowTitle(ptr.get("subject", "Email Viewer"))
         self.resize(1600, 900)
         self._setup_ui()
         self._load_email()
 
+    def _spawn(self, coro):
+        # The loop only keeps weak refs to tasks; hold them here and surface failures
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            print(f"Background task failed: {task.exception()}", file=sys.stderr)
+
     # ----- UI setup -----
 
     def _setup_ui(self):
@@ -183,6 +423,7 @@ class CombinedViewer(QMainWindow):
         self.details_group = QGroupBox("Email Details")
         self.details_group.setStyleSheet("background-color:#fff;")
         self._details_layout = QVBoxLayout(self.details_group)
+        self._detail_labels: List[QLabel] = []
         mid_layout.addWidget(self.details_group)
 
         self.body_group = QGroupBox("Email Body (Visible Text)")
@@ -196,7 +437,10 @@ class CombinedViewer(QMainWindow):
 
         self.links_group = QGroupBox("Links")
         links_layout = QVBoxLayout(self.links_group)
-        self.links_list = QListWidget()
+        self.links_model = LinksModel(self)
+        self.links_list = QListView()
+        self.links_list.setModel(self.links_model)
+        self.links_list.setUniformItemSizes(True)
         self.links_list.setStyleSheet(
             "background:#fff;color:#000;border:1px solid #ccc;font-family:Consolas,monospace;font-size:12px;"
         )
@@ -250,56 +494,28 @@ class CombinedViewer(QMainWindow):
     # ----- Loading & DOM extraction -----
 
     def _load_email(self):
+        # The web view only renders; text and links come straight from the HTML
         self.view.setHtml(self.html)
-        QTimer.singleShot(self.cfg.get("dom_delay_ms", 800), self._extract_dom)
-
-    def _extract_dom(self):
-        js = """
-        (() => {
-          const isVisible = (el) => {
-            const s = window.getComputedStyle(el);
-            if (s.display === 'none' || s.visibility === 'hidden' || parseFloat(s.opacity||'1') === 0) return false;
-            const r = el.getBoundingClientRect();
-            return r.width > 0 && r.height > 0;
-          };
-          const links = Array.from(document.querySelectorAll('a'))
-            .filter(a => a.href && !a.href.startsWith('mailto:') && !a.href.startsWith('tel:') && isVisible(a))
-            .map(a => ({ text: (a.innerText||'').trim(), href: a.href }));
-          const text = (document.body && document.body.innerText) ? document.body.innerText : '';
-          return { text, links };
-        })();
-        """
-        self.view.page().runJavaScript(js, self._on_dom)
+        self._on_dom(extract_dom(self.html))
 
     def _on_dom(self, dom):
         try:
-            visible_text = (dom or {}).get("text", "") or ""
-            links = (dom or {}).get("links", []) or []
-
-            # Rank & choose primary portal
-            ranked = rank_links(links)
-            primary = ranked[0]["href"] if ranked and ranked[0]["score"] > 0.3 else None
-
-            self.email_data = {
-                "email_ptr": self.ptr,
-                "dom": {
-                    "visible_text": visible_text,
-                    "links": links  # full hrefs preserved
-                },
-                "links": {
-                    "primary_portal": primary,
-                    "aux": [{"text": r["text"], "href": r["href"]} for r in ranked[1:6]]
-                }
-            }
-
-            # Persist a working file for downstream tools
-            with open("email_output.json", "w", encoding="utf-8") as f:
-                json.dump(self.email_data, f, indent=2)
+            self.email_data, self.ranked_links = build_email_data(self.ptr, dom)
+
+            # Prompt sections, compact JSON (indentation only costs the model tokens)
+            top = [{"text": r["text"], "href": r["href"]} for r in self.ranked_links[:TOP_LINKS]]
+            self._ptr_json = orjson.dumps(self.ptr).decode()
+            self._links_json = orjson.dumps(top).decode()
+            self._body_text = clip_text(self.email_data["dom"]["visible_text"], self.cfg["max_context_chars"])
+
+            # Persist a working file for downstream tools (disk write off the UI thread)
+            out = orjson.dumps(self.email_data, option=orjson.OPT_INDENT_2)
+            self._spawn(asyncio.to_thread(OUTPUT_PATH.write_bytes, out))
 
             # Update UI
             self._display_details(self.ptr, self.email_data["links"].get("primary_portal"))
-            self._display_body(visible_text)
-            self._display_links(links)
+            self._display_body(self.email_data["dom"]["visible_text"])
+            self._display_links(self.email_data["dom"]["links"])
 
         except Exception as e:
             QMessageBox.critical(self, "DOM Error", f"{e}\n\n{traceback.format_exc()}")
@@ -307,52 +523,41 @@ class CombinedViewer(QMainWindow):
     # ----- UI helpers -----
 
     def _display_details(self, ptr: Dict[str, Any], primary: Optional[str]):
-        # Clear old
-        while self._details_layout.count():
-            item = self._details_layout.takeAt(0)
-            w = item.widget()
-            if w:
-                w.deleteLater()
-
-        # Pointer fields
-        for k, v in ptr.items():
-            lbl = QLabel(f"{k.replace('_',' ').title()}: {v}")
-            lbl.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
-            lbl.setWordWrap(True)
-            lbl.setMaximumWidth(500)
-            self._details_layout.addWidget(lbl)
-
-        # Primary portal
+        lines = [f"{k.replace('_',' ').title()}: {v}" for k, v in ptr.items()]
         if primary:
-            p = QLabel(f"Primary Portal: {primary}")
-            p.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
-            p.setWordWrap(True)
-            p.setMaximumWidth(500)
-            self._details_layout.addWidget(p)
+            lines.append(f"Primary Portal: {primary}")
+
+        # Reuse labels from the last render; only grow the pool when needed
+        for i, text in enumerate(lines):
+            if i == len(self._detail_labels):
+                lbl = QLabel()
+                lbl.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+                lbl.setWordWrap(True)
+                lbl.setMaximumWidth(500)
+                self._details_layout.addWidget(lbl)
+                self._detail_labels.append(lbl)
+            self._detail_labels[i].setText(text)
+            self._detail_labels[i].setVisible(True)
+        for lbl in self._detail_labels[len(lines):]:
+            lbl.setVisible(False)
 
     def _display_body(self, text: str):
         self.body_browser.setPlainText(text)
 
     def _display_links(self, links: List[Dict[str, str]]):
-        self.links_list.clear()
-        for l in links:
-            text = l.get("text", "") or ""
-            href = l.get("href", "") or ""
-            ui_href = href if len(href) <= 100 else href[:100] + "…"
-            item = QListWidgetItem(f"{text} -> {ui_href}")
-            item.setToolTip(href)  # full URL on hover
-            self.links_list.addItem(item)
+        self.links_model.set_links(links)
 
     # ----- LLM chat -----
 
     def _compose_context(self) -> str:
+        # Sections are serialized once per email in _on_dom; this only picks and joins
         parts = []
         if self.header_check.isChecked():
-            parts.append("Header:\n" + json.dumps(self.email_data.get("email_ptr", {}), indent=2))
+            parts.append("Header:\n" + self._ptr_json)
         if self.body_check.isChecked():
-            parts.append("Body:\n" + (self.email_data.get("dom", {}).get("visible_text") or ""))
+            parts.append("Body:\n" + self._body_text)
         if self.links_check.isChecked():
-            parts.append("Links:\n" + json.dumps(self.email_data.get("dom", {}).get("links", []), indent=2))
+            parts.append("Links:\n" + self._links_json)
         return "\n\n".join(parts)
 
     def _send_to_llm(self):
@@ -364,49 +569,63 @@ class CombinedViewer(QMainWindow):
             return
 
         context = self._compose_context()
-        full_prompt = (
-            f"{context}\n\n"
-            "You are a bid-invite extractor. Answer the user precisely.\n"
-            "If asked, extract fields as JSON using keys: project_name, address, zip, due_date, gc_name, contacts[], links.primary.\n"
-        ) + f"\nUser: {user_msg}"
+        full_prompt = f"{context}\n\nUser: {user_msg}" if context else user_msg
 
         self.chat_display.append(f"You: {user_msg}")
         self.chat_input.clear()
-        self.chat_display.append("Model: …")
 
-        def task():
-            try:
-                return call_ollama(self.cfg, full_prompt)
-            except Exception as e:
-                return f"[ERROR] {e}"
+        # Same model + prompt (same question, same checkboxes) -> reuse the earlier answer
+        model = self._model
+        key = self._cache_key(model, full_prompt)
+        if key in self._llm_cache:
+            self.chat_display.append(f"Model: {self._llm_cache[key]}")
+            return
+        self._spawn(self._stream_llm(key, model, full_prompt, self._reply_writer()))
 
-        fut = self.pool.submit(task)
+    @staticmethod
+    def _cache_key(model: str, prompt: str) -> str:
+        return hashlib.blake2b(f"{model}\0{prompt}".encode(), digest_size=16).hexdigest()
 
-        def on_done():
-            try:
-                txt = fut.result()
-            except Exception as e:
-                txt = f"[ERROR] {e}"
-            # marshal result back to UI thread
-            QMetaObject.invokeMethod(
-                self.chat_display,
-                "append",
-                Qt.ConnectionType.QueuedConnection,
-                Q_ARG(str, f"Model: {txt}")
-            )
-
-        # finish callback (in UI thread)
-        QTimer.singleShot(0, on_done)
+    def _reply_writer(self) -> Callable[[str], None]:
+        """Start a "Model: " line and return a writer that appends to the end of that reply.
+
+        The insertion point is recomputed from the reply's last block on every write, so
+        messages appended below it meanwhile (another send, a cached answer) stay separate.
+        """
+        self.chat_display.append("Model: ")
+        block = self.chat_display.document().lastBlock()
+
+        def write(text: str) -> None:
+            nonlocal block
+            cursor = QTextCursor(block)
+            cursor.setPosition(block.position() + block.length() - 1)
+            cursor.insertText(text)
+            block = cursor.block()  # a chunk with newlines moves the reply's end
+        return write
+
+    async def _stream_llm(self, key: str, model: str, prompt: str, write: Callable[[str], None]):
+        # Runs on the Qt thread (qasync loop): chunks go straight into the chat pane
+        try:
+            reply, answered_by = await call_ollama(self.cfg, prompt, self.ollama_client, on_chunk=write,
+                                                   system=SYSTEM_PROMPT, model=model)
+            if answered_by != model:
+                # Primary unavailable: cache under the model that answered and stay on it
+                self._model = answered_by
+                key = self._cache_key(answered_by, prompt)
+            self._llm_cache[key] = reply
+        except Exception as e:
+            write(f"[ERROR] {e}")
 
     def _copy_json(self):
         if not self.email_data:
             return
-        QApplication.clipboard().setText(json.dumps(self.email_data, indent=2))
+        QApplication.clipboard().setText(orjson.dumps(self.email_data, option=orjson.OPT_INDENT_2).decode())
         self.chat_display.append("✓ JSON copied to clipboard.")
 
 # --------- Entry point ---------
 
 def main():
+    headless = "--headless" in sys.argv
     try:
         ptr, html = get_newest_matching_email_html(CONFIG)
     except Exception as e:
@@ -414,10 +633,23 @@ def main():
         print(traceback.format_exc())
         sys.exit(1)
 
+    if headless:
+        # JSON only: no QApplication, no Chromium renderer
+        email_data, _ = build_email_data(ptr, extract_dom(html))
+        OUTPUT_PATH.write_bytes(orjson.dumps(email_data, option=orjson.OPT_INDENT_2))
+        print(f"Wrote {OUTPUT_PATH}")
+        return
+
     app = QApplication(sys.argv)
+    loop = qasync.QEventLoop(app)  # asyncio on top of Qt's event loop
+    asyncio.set_event_loop(loop)
+    closed = asyncio.Event()
+    app.aboutToQuit.connect(closed.set)
+
     win = CombinedViewer(html, ptr, CONFIG)
     win.show()
-    sys.exit(app.exec())
+    with loop:
+        loop.run_until_complete(closed.wait())
 
 if __name__ == "__main__":
     main()